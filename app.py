@@ -1,11 +1,46 @@
 from os import getenv
-from os.path import isfile
-from typing import List, Optional
+from os.path import getmtime, isfile
+from typing import Dict, List, Optional
 
 from dotenv import load_dotenv
 
 from models.MovieRecommender import MovieRecommender
 
+try:
+    import readline
+
+    HAS_READLINE: bool = True
+except ImportError:  # readline is unavailable on Windows.
+    HAS_READLINE = False
+
+
+def enable_title_completion(recommender: MovieRecommender) -> None:
+    """
+    Enables case-insensitive tab completion of movie titles at the input prompt.
+
+    Args:
+        recommender (MovieRecommender): The recommender whose dataset titles are completed.
+
+    Returns:
+        None
+    """
+    if not HAS_READLINE:
+        return
+
+    matches: List[str] = []
+
+    def complete(text: str, state: int) -> Optional[str]:
+        # readline calls this once per state for the same text; match only on the first call.
+        nonlocal matches
+        if state == 0:
+            matches = recommender.match_titles(text)
+        return matches[state] if state < len(matches) else None
+
+    # Complete the whole line, since titles contain spaces and punctuation.
+    readline.set_completer_delims("")
+    readline.set_completer(complete)
+    readline.parse_and_bind("tab: complete")
+
 
 def main() -> None:
     load_dotenv()
@@ -75,7 +110,23 @@ def main() -> None:
     else:
         recommender.load_dataset("movies_dataset.json")
 
-    recommender.generate_similarity_matrix()
+    # Reuse the saved genre vectors unless the dataset has changed since they were written.
+    vectors_loaded: bool = False
+    if isfile("genre_vectors.npy") and getmtime("genre_vectors.npy") >= getmtime(
+        "movies_dataset.json"
+    ):
+        try:
+            recommender.load_genre_vectors("genre_vectors.npy")
+            vectors_loaded = True
+        except (OSError, ValueError) as e:
+            print(f"Saved genre vectors are unusable, regenerating them: {e}")
+    if not vectors_loaded:
+        recommender.generate_similarity_matrix()
+        recommender.save_genre_vectors("genre_vectors.npy")
+
+    dataset_titles: List[str] = recommender.titles.tolist()
+    titles_by_lower: Dict[str, str] = {title.lower(): title for title in dataset_titles}
+    enable_title_completion(recommender)
 
     while True:
         input_movie: str = input("\nEnter a movie title (or 'quit' to exit): ")
@@ -86,17 +137,26 @@ def main() -> None:
         if input_movie.lower() == "quit":
             break
 
-        if input_movie not in movie_titles:
-            print("Movie not found in the dataset.")
-            continue
+        movie_title: Optional[str] = titles_by_lower.get(input_movie.strip().lower())
+        if movie_title is None:
+            candidates: List[str] = recommender.match_titles(input_movie)
+            if not candidates:
+                print("Movie not found in the dataset.")
+                continue
+            if len(candidates) > 1:
+                print("Multiple movies match. Did you mean one of these?")
+                for candidate in candidates:
+                    print(f"- {candidate}")
+                continue
+            movie_title = candidates[0]
         try:
-            recommendations = recommender.recommend(input_movie, n=5)
-            print(f"Movies similar to '{input_movie}':")
+            recommendations = recommender.recommend(movie_title, n=5)
+            print(f"Movies similar to '{movie_title}':")
             for i, movie in enumerate(recommendations, start=1):
                 print(f"{i}. {movie}")
         except KeyError:
-            print(f"Movie '{input_movie}' not found in the dataset.")
-            print("Available movies:", " ".join(movie_titles))
+            print(f"Movie '{movie_title}' not found in the dataset.")
+            print("Available movies:", " ".join(dataset_titles))
 
 
 if __name__ == "__main__":
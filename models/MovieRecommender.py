@@ -1,15 +1,26 @@
+import os
+import shelve
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Union
+from functools import cached_property, lru_cache
+from hashlib import sha256
+from itertools import islice
+from tempfile import NamedTemporaryFile
+from threading import Lock, local
+from time import time
+from typing import TYPE_CHECKING, Any, ClassVar, Dict, List, Optional, Set, Tuple
 
+import numpy as np
+import orjson
 import requests
 from numpy.typing import NDArray
-from pandas import DataFrame, read_json
-from scipy.sparse import spmatrix
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 
+if TYPE_CHECKING:
+    from pandas import DataFrame
 
-@dataclass(repr=True, frozen=True)
+
+@dataclass(repr=True, frozen=True, slots=True)
 class Movie:
     """
     Represents a movie with the following attributes:
@@ -30,6 +41,42 @@ class Movie:
     rating: float
 
 
+def _cosine_top_k(
+    normalized: NDArray[np.float32], rows: NDArray[np.intp], k: int
+) -> NDArray[np.intp]:
+    """
+    Finds the `k` most similar rows of an L2-normalized matrix for each of the given query rows.
+
+    Only the similarity rows being queried are computed, with a single product for the whole batch, so the `N x N` matrix is never materialized.
+
+    Args:
+        normalized (NDArray[np.float32]): A matrix whose rows have unit (or zero) L2 norm.
+        rows (NDArray[np.intp]): The indices of the query rows.
+        k (int): The number of neighbours to return per query row.
+
+    Returns:
+        NDArray[np.intp]: A `len(rows) x k` array of neighbour indices, ordered from most to least similar, with ties in row order. A row never lists itself.
+    """
+    k = min(k, normalized.shape[0] - 1)
+    if k <= 0:
+        return np.empty((len(rows), 0), dtype=np.intp)
+
+    # Rank by distance (negated similarity) in place so no extra N-sized array is made.
+    distances: NDArray[np.float32] = normalized[rows] @ normalized.T
+    np.negative(distances, out=distances)
+    distances[np.arange(len(rows)), rows] = np.inf
+
+    # Genre vectors tie often, so order by (distance, index): tied movies come out in
+    # dataset order, and the ones that make the cut-off at the k-th distance are the
+    # lowest-indexed. Every row within the k-th distance is a candidate for that reason.
+    thresholds: NDArray[np.float32] = np.partition(distances, k - 1, axis=1)[:, k - 1]
+    neighbors: NDArray[np.intp] = np.empty((len(rows), k), dtype=np.intp)
+    for i, (distance, threshold) in enumerate(zip(distances, thresholds)):
+        candidates: NDArray[np.intp] = np.flatnonzero(distance <= threshold)
+        neighbors[i] = candidates[np.lexsort((candidates, distance[candidates]))[:k]]
+    return neighbors
+
+
 @dataclass(repr=True)
 class MovieRecommender:
     """
@@ -37,40 +84,118 @@ class MovieRecommender:
 
     The `MovieRecommender` class has the following methods:
 
-    - `fetch_movie_details(movie_title: str) -> Optional[Movie]`: Fetches movie details from the OMDb API for the given movie title.
-    - `enrich_dataset(movie_title: List[str]) -> None`: Enriches the movie dataset by fetching movie details for the given list of movie titles.
-    - `generate_similarity_matrix() -> None`: Generates a cosine similarity matrix based on the movie genres.
-    - `recommend(movie_title: str, n: int = 5) -> Optional[List[str]]`: Provides a list of n recommended movie titles based on the cosine similarity matrix.
+    - `fetch_movie_details(movie_title: str, force_refresh: bool = False) -> Optional[Movie]`: Fetches movie details from the OMDb API for the given movie title, using an on-disk response cache.
+    - `enrich_dataset(movie_title: List[str], max_workers: int = 16) -> None`: Enriches the movie dataset by concurrently fetching movie details for the given list of movie titles.
+    - `generate_similarity_matrix() -> None`: Prepares the normalized genre vectors used for cosine similarity.
+    - `recommend(movie_title: str, n: int = 5) -> Optional[List[str]]`: Provides a list of n recommended movie titles based on genre cosine similarity.
+    - `match_titles(query: str) -> List[str]`: Finds the dataset titles that match a partial, case-insensitive query.
     - `save_dataset(file_path: str) -> None`: Saves the movie dataset to the specified file path in JSON format.
     - `load_dataset(file_path: str) -> None`: Loads the movie dataset from the specified file path.
+    - `save_genre_vectors(file_path: str) -> None`: Saves the normalized genre vectors to the specified `.npy` file path.
+    - `load_genre_vectors(file_path: str) -> None`: Loads previously saved genre vectors, memory-mapped, instead of regenerating them.
     """
 
     api_key: str
-    movie_data: DataFrame = field(default_factory=DataFrame)
-    cosine_sim_matrix: NDArray = field(default=None)
+    cache_path: str = "omdb_cache"
+    titles: NDArray[np.object_] = field(init=False)
+    years: NDArray[np.int16] = field(init=False)
+    genres: NDArray[np.object_] = field(init=False)
+    directors: NDArray[np.object_] = field(init=False)
+    plots: NDArray[np.object_] = field(init=False)
+    ratings: NDArray[np.float32] = field(init=False)
+    genre_vectors: Optional[NDArray[np.float32]] = field(default=None)
+
+    OMDB_URL: ClassVar[str] = "https://www.omdbapi.com/"
+    REQUEST_TIMEOUT: ClassVar[float] = 5.0
+    # Cached OMDb responses are considered fresh for 30 days.
+    CACHE_TTL: ClassVar[float] = 60 * 60 * 24 * 30
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_path: str = "omdb_cache"):
         self.api_key: str = api_key
-        self.movie_data: DataFrame = DataFrame()
-        self.cosine_sim_matrix = None
+        self.cache_path: str = cache_path
+        self.genre_vectors = None
+        self._title_to_idx: Dict[str, int] = {}
+        # Memoized per instance and cleared whenever the dataset or genre vectors change.
+        self._recommend_cached = lru_cache(maxsize=1024)(self._top_titles)
+        self._set_movies([])
+        # shelve does not support concurrent access from worker threads.
+        self._cache_lock: Lock = Lock()
+        # One keep-alive session per worker thread; `requests.Session` is not thread-safe.
+        self._thread_local: local = local()
+
+    def _session(self) -> requests.Session:
+        session: Optional[requests.Session] = getattr(
+            self._thread_local, "session", None
+        )
+        if session is None:
+            session = requests.Session()
+            session.params = {"apikey": self.api_key}
+            self._thread_local.session = session
+        return session
+
+    def _cache_key(self, movie_title: str) -> str:
+        # Namespace entries by API key without writing the key itself to disk.
+        namespace: str = sha256(self.api_key.encode()).hexdigest()[:16]
+        return f"{namespace}:{movie_title.lower()}"
+
+    def _read_cache(self, key: str) -> Optional[Dict[str, Any]]:
+        # The cache is only an optimization: any failure to read or write it, including
+        # whatever a corrupt dbm index or pickled entry raises, falls back to the network.
+        try:
+            with self._cache_lock, shelve.open(self.cache_path) as cache:
+                entry: Any = cache.get(key)
+            if entry is None or time() - entry["fetched_at"] >= self.CACHE_TTL:
+                return None
+            data: Any = entry["data"]
+            if not isinstance(data, dict):
+                raise TypeError(f"cached entry holds {type(data).__name__}, not dict")
+            return data
+        except Exception as e:
+            print(f"Error reading the response cache: {e}")
+            return None
+
+    def _write_cache(self, key: str, data: Dict[str, Any]) -> None:
+        try:
+            with self._cache_lock, shelve.open(self.cache_path) as cache:
+                cache[key] = {"fetched_at": time(), "data": data}
+        except Exception as e:
+            print(f"Error writing the response cache: {e}")
+
+    def _request_movie_data(self, movie_title: str, force_refresh: bool = False) -> Any:
+        key: str = self._cache_key(movie_title)
+        if not force_refresh:
+            cached: Optional[Dict[str, Any]] = self._read_cache(key)
+            if cached is not None:
+                return cached
 
-    def fetch_movie_details(self, movie_title: str) -> Optional[Movie]:
+        response: requests.Response = self._session().get(
+            self.OMDB_URL, params={"t": movie_title}, timeout=self.REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        # Only successful lookups are cached, so misses are retried next run.
+        if data.get("Response") == "True":
+            self._write_cache(key, data)
+        return data
+
+    def fetch_movie_details(
+        self, movie_title: str, force_refresh: bool = False
+    ) -> Optional[Movie]:
         """
         Fetches movie details from the OMDb API for the given movie title.
 
+        Responses are cached on disk at `cache_path`, so repeated lookups of the same title are served locally.
+
         Args:
             movie_title (str): The title of the movie to fetch details for.
+            force_refresh (bool): Bypass the on-disk cache and query the API again.
 
         Returns:
             Optional[Movie]: A `Movie` object containing the fetched movie details, or `None` if the movie was not found or an error occurred.
         """
-        url: str = f"http://www.omdbapi.com/"
-        params: Dict[str, str] = {"apikey": self.api_key, "t": movie_title}
-
         try:
-            response: requests.Response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self._request_movie_data(movie_title, force_refresh)
 
             if data.get("Response") == "True":
                 return Movie(
@@ -92,54 +217,137 @@ class MovieRecommender:
             print(f"Error fetching movie details: {e}")
             return None
 
-    def enrich_dataset(self, movie_title: List[str]) -> None:
+    def enrich_dataset(self, movie_title: List[str], max_workers: int = 16) -> None:
         """
         Enriches the movie dataset by fetching movie details from the OMDb API for the given list of movie titles.
 
+        Requests are issued concurrently; the order of the input titles is preserved.
+
         Args:
             movie_title (List[str]): A list of movie titles to fetch details for.
+            max_workers (int): The maximum number of concurrent API requests.
 
         Returns:
             None
         """
-        enriched_data: List[Optional[Movie]] = [
-            self.fetch_movie_details(title) for title in movie_title if title
-        ]
-        self.movie_data = DataFrame(
-            [movie for movie in enriched_data if movie is not None]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            enriched_data: List[Optional[Movie]] = list(
+                pool.map(self.fetch_movie_details, filter(None, movie_title))
+            )
+        self._set_movies([movie for movie in enriched_data if movie is not None])
+
+    def _set_movies(self, movies: List[Movie]) -> None:
+        # The `Movie` list is the source of truth; the columns below are derived views for the numeric paths.
+        self._movies: List[Movie] = movies
+        self.titles = np.array([movie.title for movie in movies], dtype=object)
+        self.years = np.array([movie.year for movie in movies], dtype=np.int16)
+        self.genres = np.array([movie.genre for movie in movies], dtype=object)
+        self.directors = np.array([movie.director for movie in movies], dtype=object)
+        self.plots = np.array([movie.plot for movie in movies], dtype=object)
+        self.ratings = np.array([movie.rating for movie in movies], dtype=np.float32)
+        self._title_to_idx = {title: i for i, title in enumerate(self.titles)}
+        # Lower-cased titles in sorted order, so prefix matches are a binary search.
+        self._sorted_titles: List[Tuple[str, str]] = sorted(
+            (title.lower(), title) for title in self._title_to_idx
         )
+        self._sorted_keys: List[str] = [key for key, _ in self._sorted_titles]
+        # Genre vectors computed for a previous dataset no longer apply.
+        self.genre_vectors = None
+        self._recommend_cached.cache_clear()
+        self.__dict__.pop("movie_data", None)
+
+    @cached_property
+    def movie_data(self) -> "DataFrame":
+        """
+        The movie dataset as a pandas `DataFrame`, built on first access for callers that need one.
+        """
+        from pandas import DataFrame
+
+        return DataFrame(self._movies)
 
     def generate_similarity_matrix(self) -> None:
-        if self.movie_data.empty:
+        """
+        Prepares the L2-normalized genre vectors that cosine similarity is computed from.
+
+        No similarity matrix is materialized; `recommend` computes the single row it needs on demand, so memory grows as `N x genres` rather than `N x N`.
+
+        Returns:
+            None
+        """
+        if self.titles.size == 0:
             raise ValueError(
                 "Movie data is empty. Please enrich the movie dataset first."
             )
 
-        # self.movie_data["genre"] = self.movie_data["genre"].str.split(", ")
-        genre_matrix: Union[NDArray, spmatrix] = CountVectorizer().fit_transform(
-            self.movie_data["genre"].fillna("")
+        # OMDb genres are already ", "-delimited, so build the multi-hot matrix directly.
+        # "N/A" is OMDb's placeholder for a missing genre, not a genre of its own.
+        genres_per_movie: List[Set[str]] = [
+            {name for name in (genre or "").split(", ") if name and name != "N/A"}
+            for genre in self.genres
+        ]
+        vocabulary: Dict[str, int] = {
+            genre: i for i, genre in enumerate(sorted(set().union(*genres_per_movie)))
+        }
+        genre_matrix: NDArray[np.uint8] = np.zeros(
+            (len(genres_per_movie), len(vocabulary)), dtype=np.uint8
         )
-        self.cosine_sim_matrix = cosine_similarity(genre_matrix, genre_matrix)
+        for row, movie_genres in enumerate(genres_per_movie):
+            genre_matrix[row, [vocabulary[genre] for genre in movie_genres]] = 1
+
+        # Normalize the rows once so each cosine row is a single product.
+        normalized: NDArray[np.float32] = genre_matrix.astype(np.float32)
+        norms: NDArray[np.float32] = np.linalg.norm(normalized, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        normalized /= norms
+        self.genre_vectors = normalized
+        self._recommend_cached.cache_clear()
 
     def recommend(self, movie_title: str, n: int = 5) -> Optional[List[str]]:
-        if self.cosine_sim_matrix is None:
+        try:
+            return list(self._recommend_cached(movie_title, n))
+        except KeyError:
+            print(f"Movie not found: {movie_title}")
+            return None
+
+    def _top_titles(self, movie_title: str, n: int) -> Tuple[str, ...]:
+        # Checked here rather than in `recommend` so the narrowed type reaches the kernel.
+        if self.genre_vectors is None:
             raise ValueError(
                 "Similarity matrix is not generated. Please generate it first."
             )
 
-        try:
-            movie_index = self.movie_data[
-                self.movie_data["title"] == movie_title
-            ].index[0]
-            similarity_scores = list(enumerate(self.cosine_sim_matrix[movie_index]))
-            similarity_scores = sorted(
-                similarity_scores, key=lambda x: x[1], reverse=True
-            )
-            top_indices = [i[0] for i in similarity_scores[1 : n + 1]]
-            return self.movie_data.iloc[top_indices]["title"].tolist()
-        except IndexError:
-            print(f"Movie not found: {movie_title}")
-            return None
+        movie_index: int = self._title_to_idx[movie_title]
+        top_indices: NDArray[np.intp] = _cosine_top_k(
+            self.genre_vectors, np.array([movie_index]), n
+        )[0]
+        return tuple(self.titles[top_indices].tolist())
+
+    def match_titles(self, query: str) -> List[str]:
+        """
+        Finds the dataset titles that match a partial, case-insensitive query.
+
+        Titles starting with the query are found by binary search over the sorted titles; if there are none, titles containing the query anywhere are returned instead.
+
+        Args:
+            query (str): The partial movie title to match.
+
+        Returns:
+            List[str]: The matching titles in alphabetical order, or an empty list if nothing matches.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        matches: List[str] = []
+        for key, title in islice(
+            self._sorted_titles, bisect_left(self._sorted_keys, query), None
+        ):
+            if not key.startswith(query):
+                break
+            matches.append(title)
+        if matches:
+            return matches
+        return [title for key, title in self._sorted_titles if query in key]
 
     def save_dataset(self, file_path: str) -> None:
         """
@@ -151,9 +359,66 @@ class MovieRecommender:
         Returns:
             None
         """
-        self.movie_data.to_json(file_path, orient="records", indent=4)
+        with open(file_path, "wb") as file:
+            file.write(orjson.dumps(self._movies, option=orjson.OPT_INDENT_2))
         print(f"Dataset saved to: {file_path}")
 
     def load_dataset(self, file_path: str) -> None:
-        self.movie_data = DataFrame(read_json(file_path, orient="records"))
+        with open(file_path, "rb") as file:
+            records: List[Dict[str, Any]] = orjson.loads(file.read())
+        self._set_movies([Movie(**record) for record in records])
         print(f"Dataset loaded from: {file_path}")
+
+    def save_genre_vectors(self, file_path: str) -> None:
+        """
+        Saves the normalized genre vectors to the specified `.npy` file path, so later runs can skip `generate_similarity_matrix`.
+
+        The file is replaced atomically, so arrays still memory-mapped from a previous version of it (by `load_genre_vectors`, here or in another process) stay valid.
+
+        Args:
+            file_path (str): The file path to save the genre vectors to.
+
+        Returns:
+            None
+        """
+        if self.genre_vectors is None:
+            raise ValueError(
+                "Similarity matrix is not generated. Please generate it first."
+            )
+
+        # Writing in place would truncate a file that may be memory-mapped, and reading
+        # a truncated mapping crashes with SIGBUS. Write a sibling file and swap it in.
+        with NamedTemporaryFile(
+            dir=os.path.dirname(os.path.abspath(file_path)), suffix=".npy", delete=False
+        ) as file:
+            temp_path: str = file.name
+            try:
+                np.save(file, self.genre_vectors)
+            except BaseException:
+                file.close()
+                os.remove(temp_path)
+                raise
+        os.replace(temp_path, file_path)
+        print(f"Genre vectors saved to: {file_path}")
+
+    def load_genre_vectors(self, file_path: str) -> None:
+        """
+        Loads normalized genre vectors saved by `save_genre_vectors` in place of calling `generate_similarity_matrix`.
+
+        The file is memory-mapped read-only rather than copied into memory. The vectors must have been generated from the currently loaded dataset.
+
+        Args:
+            file_path (str): The `.npy` file path to load the genre vectors from.
+
+        Returns:
+            None
+        """
+        genre_vectors: NDArray[np.float32] = np.load(file_path, mmap_mode="r")
+        if genre_vectors.shape[0] != self.titles.size:
+            raise ValueError(
+                "Genre vectors do not match the loaded dataset. Please generate them again."
+            )
+
+        self.genre_vectors = genre_vectors
+        self._recommend_cached.cache_clear()
+        print(f"Genre vectors loaded from: {file_path}")